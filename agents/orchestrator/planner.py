@@ -1,10 +1,7 @@
 from __future__ import annotations
-import json, os, subprocess, sys, typer
-from typing import List, Literal
-from pydantic import BaseModel, Field
-from langgraph.graph import StateGraph, START, END
-from langgraph.types import Command
-from langchain_openai import ChatOpenAI
+import functools, hashlib, json, os, re, subprocess, tempfile, typer
+from typing import Dict, List
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 
 app = typer.Typer()
 
@@ -16,9 +13,10 @@ class Task(BaseModel):
     dependencies: List[int] = Field(default_factory=list)  # Issue numbers this depends on
     ai_ready: bool = True  # if true => label 'fix-me' to trigger OpenHands
 
-class PlanState(BaseModel):
-    spec: str
-    tasks: List[Task] = Field(default_factory=list)
+_TASKS_ADAPTER = TypeAdapter(List[Task])
+
+# Greedy outermost-bracket match for pulling the JSON array out of prose
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
 
 PLANNER_SYS = """You are the Planner for a Garage Inventory system (Angular + .NET, Onion Arch).
 
@@ -64,57 +62,203 @@ For TDD compliance:
 Output strictly as JSON list of tasks with fields: title (string), body (string), labels (array of strings), assignees (array of strings), ai_ready (boolean), dependencies (array of integers).
 """
 
-def make_llm():
-    # Uses OpenAI-compatible; swap to Anthropic via langchain_anthropic if you prefer.
-    model = os.getenv("PLANNER_MODEL", "gpt-4o")
-    return ChatOpenAI(model=model, temperature=0)
+_CACHE_DIR = os.path.expanduser("~/.cache/planner")
+
+def _cache_store(path: str, data: bytes):
+    """Write cache entry atomically (tmpfile + rename) so concurrent runs never read partial files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+@functools.lru_cache(maxsize=4)
+def make_llm(model: str | None = None, temperature: float = 0.0):
+    # Uses OpenAI-compatible by default; claude models go through langchain_anthropic.
+    # Cached so repeat calls in a long-lived process reuse the HTTP client
+    # and tokenizer instead of rebuilding them.
+    if model is None:
+        model = os.getenv("PLANNER_MODEL", "gpt-4o")
+    if model.startswith("claude"):
+        from langchain_anthropic import ChatAnthropic
+        return ChatAnthropic(model=model, temperature=temperature)
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=model, temperature=temperature)
+
+def build_prompt(system: str, user: str, model: str):
+    """Build the chat prompt, marking the static system prefix for provider-side caching.
+
+    Anthropic needs an explicit cache_control block on the cached prefix;
+    OpenAI caches automatically as long as the static content comes first.
+    """
+    if model.startswith("claude"):
+        from langchain_core.messages import HumanMessage, SystemMessage
+        return [SystemMessage(content=[{"type": "text", "text": system,
+                                        "cache_control": {"type": "ephemeral"}}]),
+                HumanMessage(content=user)]
+    return [{"role": "system", "content": system},
+            {"role": "user", "content": user}]
 
 def plan_from_spec(spec: str) -> List[Task]:
-    llm = make_llm()
-    prompt = [{"role": "system", "content": PLANNER_SYS},
-              {"role": "user", "content": spec}]
+    model = os.getenv("PLANNER_MODEL", "gpt-4o")
+    key = hashlib.blake2b((PLANNER_SYS + spec).encode(), digest_size=16).hexdigest()
+    return list(_plan_from_spec_cached(model, key, spec))
+
+@functools.lru_cache(maxsize=32)
+def _plan_from_spec_cached(model: str, key: str, spec: str) -> tuple[Task, ...]:
+    # Disk cache: unchanged specs (CI retries, local iteration) skip the LLM call entirely
+    cache_path = os.path.join(_CACHE_DIR, f"{key}.json")
+    try:
+        with open(cache_path, "rb") as f:
+            return tuple(_TASKS_ADAPTER.validate_json(f.read()))
+    except (OSError, ValidationError):
+        pass
+    llm = make_llm(model)
+    prompt = build_prompt(PLANNER_SYS, spec, model)
     raw = llm.invoke(prompt).content
     try:
-        data = json.loads(raw)
-    except Exception:
+        # Parse + validate in a single pass instead of json.loads -> Task(**t)
+        tasks = _TASKS_ADAPTER.validate_json(raw)
+    except ValidationError:
         # retry with fenced extraction if the model added prose
-        start = raw.find("["); end = raw.rfind("]")+1
-        data = json.loads(raw[start:end])
-    return [Task(**t) for t in data]
+        m = _JSON_ARRAY_RE.search(raw)
+        if m is None:
+            raise ValueError(f"planner returned no JSON array: {raw[:200]!r}")
+        tasks = _TASKS_ADAPTER.validate_json(m.group(0))
+    _cache_store(cache_path, _TASKS_ADAPTER.dump_json(tasks))
+    return tuple(tasks)
+
+def load_plan(path: str) -> List[Task]:
+    """Reload a plan artifact the planner itself wrote (e.g. planner_output.json).
+
+    Uses model_construct to skip pydantic validation, which is safe only
+    because the file was serialized from already-validated Task objects.
+    Never point this at hand-edited or externally produced JSON — use
+    _TASKS_ADAPTER.validate_json for that.
+    """
+    with open(path, "rb") as f:
+        data = json.loads(f.read())
+    return [Task.model_construct(**t) for t in data]
+
+def _repo_context() -> tuple[str, Dict[str, str]]:
+    """Fetch the repository node id and label name->id map in one GraphQL call."""
+    full = os.getenv("GITHUB_REPOSITORY")
+    if not full:
+        full = subprocess.check_output(
+            ["gh", "repo", "view", "--json", "nameWithOwner", "-q", ".nameWithOwner"],
+            text=True).strip()
+    owner, name = full.split("/", 1)
+    # fix-me is resolved explicitly as well, so it is found even when the
+    # repository has more than 100 labels and the page misses it
+    query = ('{ repository(owner: %s, name: %s) '
+             '{ id labels(first: 100) { nodes { id name } } '
+             'label(name: "fix-me") { id } } }'
+             % (json.dumps(owner), json.dumps(name)))
+    out = subprocess.check_output(["gh", "api", "graphql", "-f", f"query={query}"], text=True)
+    repo = json.loads(out)["data"]["repository"]
+    label_ids = {n["name"]: n["id"] for n in repo["labels"]["nodes"]}
+    if repo.get("label"):
+        label_ids["fix-me"] = repo["label"]["id"]
+    return repo["id"], label_ids
 
-def create_issue(task: Task):
-    # First create the issue with basic labels (no fix-me yet)
+def create_issues_bulk(tasks: List[Task]) -> List[int]:
+    """Create all issues in a single GraphQL call.
+
+    Collapses the N x (gh issue create + gh issue edit) subprocess/REST loop
+    into one call via aliased createIssue mutations. fix-me rides along in
+    labelIds for AI-ready tasks — creation-time labels fire the labeled
+    webhook too, so OpenHands still triggers without a follow-up edit.
+    """
+    repo_id, label_ids = _repo_context()
+    fixme_id = label_ids.get("fix-me")
+    if fixme_id is None and any(t.ai_ready for t in tasks):
+        # Without the trigger label AI-ready issues would sit idle forever;
+        # fail loudly like the old gh issue edit --add-label did
+        raise RuntimeError(
+            "fix-me label not found in repository; create it first "
+            "(see the plan workflow) so AI-ready issues trigger OpenHands")
+    mutations = []
+    for i, t in enumerate(tasks):
+        ids = []
+        for l in t.labels:
+            if l in label_ids:
+                ids.append(label_ids[l])
+            else:
+                print(f"WARNING: label '{l}' not found in repository; "
+                      f"issue '{t.title}' will be created without it")
+        if t.ai_ready:
+            ids.append(fixme_id)
+        mutations.append(
+            f'i{i}: createIssue(input: {{repositoryId: {json.dumps(repo_id)}, '
+            f'title: {json.dumps(t.title)}, body: {json.dumps(t.body)}, '
+            f'labelIds: {json.dumps(ids)}}}) {{ issue {{ id number url }} }}')
+    doc = "mutation { " + " ".join(mutations) + " }"
+    try:
+        out = subprocess.run(["gh", "api", "graphql", "-f", f"query={doc}"],
+                             capture_output=True, text=True, check=True)
+        data = json.loads(out.stdout)["data"]
+    except subprocess.CalledProcessError as e:
+        # Aliased mutations run serially with no rollback, so issues created
+        # before a failing alias exist even though gh exited non-zero.
+        # Recover the partial data so the caller never re-creates them.
+        try:
+            data = json.loads(e.stdout)["data"] or {}
+        except (ValueError, KeyError, TypeError):
+            raise e
+        if not data:
+            raise
+        print(f"Bulk creation partially failed: {e.stderr.strip()}")
+
+    numbers = []
+    for i, t in enumerate(tasks):
+        node = data.get(f"i{i}")
+        if node is None:
+            # Only the aliases that actually failed get the per-issue retry
+            print(f"Retrying '{t.title}' individually after bulk failure")
+            number = create_issue(t)
+            if number is not None:
+                numbers.append(number)
+            continue
+        issue = node["issue"]
+        print(issue["url"])
+        if t.ai_ready:
+            print(f"Issue #{issue['number']} created with fix-me label to trigger OpenHands")
+        numbers.append(issue["number"])
+    return numbers
+
+def create_issue(task: Task) -> int | None:
+    # Creation-time labels fire the labeled event, so fix-me goes in up front
     labels = task.labels[:]
+    if task.ai_ready:
+        labels.append("fix-me")
+    # gh issue create only prints a URL, so go through the REST endpoint and
+    # ask for the number as JSON rather than string-parsing the URL
     cmd = [
-        "gh","issue","create",
-        "--title", task.title,
-        "--body", task.body,
+        "gh","api","repos/{owner}/{repo}/issues",
+        "-f", f"title={task.title}",
+        "-f", f"body={task.body}",
+        "--jq", ".number",
     ]
-    if labels: cmd += ["--label", ",".join(labels)]
-    
+    for label in labels:
+        cmd += ["-f", f"labels[]={label}"]
+
     try:
         # Create issue and capture the issue number
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        issue_url = result.stdout.strip()
-        issue_number = issue_url.split('/')[-1]
-        print(issue_url)  # Print the issue URL for logging
-        
-        # If AI-ready, add fix-me label separately to trigger the labeled event
+        issue_number = result.stdout.strip()
+
         if task.ai_ready:
-            subprocess.check_call([
-                "gh", "issue", "edit", issue_number,
-                "--add-label", "fix-me"
-            ])
-            print(f"Added fix-me label to issue #{issue_number} to trigger OpenHands")
+            print(f"Issue #{issue_number} created with fix-me label to trigger OpenHands")
         else:
             print(f"Issue #{issue_number} created without fix-me label (will be triggered later by pipeline)")
-            
+        return int(issue_number)
+
     except subprocess.CalledProcessError as e:
         print(f"ERROR creating issue '{task.title}': {e}")
         if e.stderr:
             print(f"Error details: {e.stderr}")
         print("Continuing with remaining issues...")
-        return  # Skip this issue but continue with others
+        return None  # Skip this issue but continue with others
 
 @app.command()
 def cli(spec_path: str = typer.Argument(..., help="Path to feature spec .md")):
@@ -122,31 +266,37 @@ def cli(spec_path: str = typer.Argument(..., help="Path to feature spec .md")):
     tasks = plan_from_spec(spec)
     # Persist plan (artifact)
     with open("planner_output.json","w",encoding="utf-8") as f:
-        json.dump([t.model_dump() for t in tasks], f, indent=2)
-    # Create issues via gh
+        f.write(_TASKS_ADAPTER.dump_json(tasks, indent=2).decode())
+    # Create issues via gh (single batched GraphQL call)
     created_count = 0
-    issue_numbers = []
-    
+
+    # Force first issue to be AI-ready, disable for all others
+    original_ai_ready = [t.ai_ready for t in tasks]
     for i, t in enumerate(tasks):
-        try:
-            # Force first issue to be AI-ready, disable for all others
-            original_ai_ready = t.ai_ready
-            if i == 0:  # First issue ALWAYS gets fix-me label
-                print(f"🚀 Setting first issue to AI-ready (was: {original_ai_ready})")
-                t.ai_ready = True
-            else:  # All other issues don't get fix-me initially
-                t.ai_ready = False
-                
-            create_issue(t)
-            created_count += 1
-            
-            # Restore original ai_ready for JSON output
-            t.ai_ready = original_ai_ready
-            
-        except Exception as e:
-            print(f"Failed to create issue '{t.title}': {e}")
-            continue
-            
+        if i == 0:  # First issue ALWAYS gets fix-me label
+            print(f"🚀 Setting first issue to AI-ready (was: {t.ai_ready})")
+            t.ai_ready = True
+        else:  # All other issues don't get fix-me initially
+            t.ai_ready = False
+
+    try:
+        created_count = len(create_issues_bulk(tasks))
+    except Exception as e:
+        # create_issues_bulk only raises when nothing was created, so the
+        # full per-issue fallback cannot produce duplicates
+        print(f"Bulk issue creation failed ({e}); falling back to per-issue creation")
+        for t in tasks:
+            try:
+                if create_issue(t) is not None:
+                    created_count += 1
+            except Exception as e:
+                print(f"Failed to create issue '{t.title}': {e}")
+                continue
+
+    # Restore original ai_ready for JSON output
+    for t, flag in zip(tasks, original_ai_ready):
+        t.ai_ready = flag
+
     print(f"\n✅ Created {created_count}/{len(tasks)} issues from {spec_path}")
     if created_count > 0:
         print("🚀 Only the FIRST issue has the fix-me label to start the pipeline.")